@@ -420,24 +420,21 @@ Be concise, helpful, and NEVER mention gcloud setup or GCP authentication.
             self.project_context['repo_url'] = repo_url
             self.project_context['branch'] = branch
             
+            # Step 2: Analyze project using AnalysisService
+            # (fused complete+start - one WebSocket frame per transition)
             if progress_notifier:
-                await progress_notifier.complete_stage(
+                await progress_notifier.transition_stage(
                     DeploymentStages.REPO_CLONE,
+                    DeploymentStages.CODE_ANALYSIS,
                     f"✅ Repository cloned ({clone_result['files_count']} files)",
+                    "🔍 Analyzing project structure and dependencies...",
                     details={
                         "repo_name": clone_result['repo_name'],
                         "files": clone_result['files_count'],
                         "size": f"{clone_result['size_mb']} MB"
                     }
                 )
-            
-            # Step 2: Analyze project using AnalysisService
-            if progress_notifier:
-                await progress_notifier.start_stage(
-                    DeploymentStages.CODE_ANALYSIS,
-                    "🔍 Analyzing project structure and dependencies..."
-                )
-            
+
             try:
                 analysis_result = await self.analysis_service.analyze_and_generate(project_path)
             except Exception as e:
@@ -470,24 +467,21 @@ Be concise, helpful, and NEVER mention gcloud setup or GCP authentication.
             
             analysis_data = analysis_result['analysis']
             
+            # Step 3: Generate and save Dockerfile
+            # (fused complete+start - one WebSocket frame per transition)
             if progress_notifier:
-                await progress_notifier.complete_stage(
+                await progress_notifier.transition_stage(
                     DeploymentStages.CODE_ANALYSIS,
+                    DeploymentStages.DOCKERFILE_GEN,
                     f"✅ Analysis complete: {analysis_data['framework']} detected",
+                    "🐳 Generating optimized Dockerfile...",
                     details={
                         "framework": analysis_data['framework'],
                         "language": analysis_data['language'],
                         "dependencies": analysis_data.get('dependencies_count', 0)
                     }
                 )
-            
-            # Step 3: Generate and save Dockerfile
-            if progress_notifier:
-                await progress_notifier.start_stage(
-                    DeploymentStages.DOCKERFILE_GEN,
-                    "🐳 Generating optimized Dockerfile..."
-                )
-            
+
             dockerfile_save = self.docker_service.save_dockerfile(
                 analysis_result['dockerfile']['content'],
                 project_path
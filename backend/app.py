@@ -6,6 +6,8 @@ FastAPI server optimized for Google Cloud Run
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.websockets import WebSocketState
+from websockets.exceptions import ConnectionClosed
 from pydantic import BaseModel
 from typing import Optional, List
 import os
@@ -13,6 +15,10 @@ from dotenv import load_dotenv
 import asyncio
 from datetime import datetime
 import json
+import orjson
+import logging
+import logging.handlers
+import queue
 import uuid
 import traceback
 
@@ -30,6 +36,18 @@ from utils.progress_notifier import ProgressNotifier, DeploymentStages
 
 load_dotenv()
 
+# Hot-path logging goes through a queue so the event loop thread only does
+# a non-blocking put - the stdout write syscall happens on a background thread
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+
+_servergem_logger = logging.getLogger("servergem")
+_servergem_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_servergem_logger.setLevel(logging.INFO)
+
+logger = logging.getLogger("servergem.websocket")
+
 app = FastAPI(
     title="ServerGem API",
     description="AI-powered Cloud Run deployment assistant",
@@ -51,6 +69,25 @@ app.add_middleware(UsageTrackingMiddleware)
 # Store active WebSocket connections with metadata
 active_connections: dict[str, dict] = {}
 
+# Per-session reconnect signals: the current Event is set (and replaced)
+# whenever a session's WebSocket is registered, so senders waiting on a
+# transient disconnect wake the moment reconnection completes
+session_events: dict[str, asyncio.Event] = {}
+
+# Optional cross-worker fanout: with multiple uvicorn workers each process
+# has its own active_connections, so a send for a session owned by another
+# worker would silently fail. With REDIS_URL set, such sends are published
+# to a per-session channel and the owning worker relays them to its socket.
+redis_client = None
+if os.getenv("REDIS_URL"):
+    import redis.asyncio as aioredis
+    redis_client = aioredis.from_url(os.getenv("REDIS_URL"))
+
+# Relay tasks tracked separately from active_connections: a failed send can
+# pop the connection entry, and the relay must stay reachable (and
+# cancellable) even then - asyncio only keeps weak refs to running tasks
+session_relays: dict[str, asyncio.Task] = {}
+
 # Initialize orchestrator
 orchestrator = OrchestratorAgent(
     gemini_api_key=os.getenv('GEMINI_API_KEY'),
@@ -73,56 +110,118 @@ async def safe_send_json(session_id: str, data: dict) -> bool:
     Safely send JSON to WebSocket, handling all error cases.
     Returns True if sent successfully, False otherwise.
     """
-    if session_id not in active_connections:
-        print(f"[WebSocket] ⚠️  Session {session_id} not in active connections")
+    # Single dict lookup - session ids are long UUID strings, so avoid
+    # hashing them twice ('in' check followed by indexing) on every send
+    connection_info = active_connections.get(session_id)
+    if connection_info is None:
+        # Session may be owned by another uvicorn worker - relay via Redis
+        if redis_client is not None:
+            try:
+                receivers = await redis_client.publish(f"ws:{session_id}", orjson.dumps(data))
+                if receivers:
+                    logger.debug(f"[WebSocket] 📡 Relayed to {session_id} via Redis")
+                    return True
+            except Exception as e:
+                logger.error(f"[WebSocket] ❌ Redis publish failed for {session_id}: {e}")
+
+        logger.warning(f"[WebSocket] ⚠️  Session {session_id} not in active connections")
         return False
-    
-    connection_info = active_connections[session_id]
+
     websocket = connection_info['websocket']
-    
+
     try:
         # Check if WebSocket is in a state that can send
-        if websocket.client_state.name != "CONNECTED":
-            print(f"[WebSocket] ⚠️  Session {session_id} not connected (state: {websocket.client_state.name})")
+        # (identity check on the enum singleton - no string comparison)
+        if websocket.client_state is not WebSocketState.CONNECTED:
+            logger.warning(f"[WebSocket] ⚠️  Session {session_id} not connected (state: {websocket.client_state.name})")
             return False
-        
-        # Try to send
-        await websocket.send_json(data)
-        print(f"[WebSocket] ✅ Sent to {session_id}: {data.get('type', 'unknown')}")
+
+        # Send as an orjson-encoded binary frame: one bytes allocation and
+        # C-native serialization vs stdlib json.dumps().encode() in send_json.
+        # The send callable was bound at registration - no method resolution
+        # per message
+        await connection_info['send_bytes'](orjson.dumps(data))
+        logger.debug(f"[WebSocket] ✅ Sent to {session_id}: {data.get('type', 'unknown')}")
         return True
-        
+
+    except (WebSocketDisconnect, ConnectionClosed):
+        logger.warning(f"[WebSocket] ⚠️  Session {session_id} disconnected, removing from active connections")
+        active_connections.pop(session_id, None)
+        return False
+
     except RuntimeError as e:
-        if "close message has been sent" in str(e):
-            print(f"[WebSocket] ⚠️  Session {session_id} already closed, removing from active connections")
-            # Remove from active connections
-            if session_id in active_connections:
-                del active_connections[session_id]
-            return False
-        else:
-            print(f"[WebSocket] ❌ RuntimeError sending to {session_id}: {e}")
-            return False
-            
+        # Starlette signals send-after-close with a bare RuntimeError; the
+        # connection is unusable either way, so drop it without scanning
+        # the exception message
+        logger.warning(f"[WebSocket] ⚠️  Session {session_id} unusable ({e}), removing from active connections")
+        active_connections.pop(session_id, None)
+        return False
+
     except Exception as e:
-        print(f"[WebSocket] ❌ Error sending to {session_id}: {e}")
+        logger.error(f"[WebSocket] ❌ Error sending to {session_id}: {e}")
         return False
 
 
 async def broadcast_to_session(session_id: str, data: dict):
     """Broadcast message to a specific session with retries"""
     max_retries = 3
+    backoff = 0.005
     for attempt in range(max_retries):
         success = await safe_send_json(session_id, data)
         if success:
             return True
-        
+
+        # Retrying only helps if the session can come back: with no
+        # registered connection and no armed reconnect signal, fail fast
+        if session_id not in active_connections and session_id not in session_events:
+            break
+
         if attempt < max_retries - 1:
-            print(f"[WebSocket] 🔄 Retry {attempt + 1}/{max_retries} for session {session_id}")
-            await asyncio.sleep(0.5)
-    
-    print(f"[WebSocket] ❌ Failed to send to {session_id} after {max_retries} attempts")
+            logger.info(f"[WebSocket] 🔄 Retry {attempt + 1}/{max_retries} for session {session_id}")
+
+            reconnect_event = session_events.get(session_id)
+            if reconnect_event is not None:
+                # Event-driven: resume the moment the session reconnects
+                # instead of polling on a fixed sleep
+                try:
+                    await asyncio.wait_for(reconnect_event.wait(), timeout=2.0)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                # No reconnect signal available - short exponential backoff
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 4, 1.0)
+
+    logger.error(f"[WebSocket] ❌ Failed to send to {session_id} after {max_retries} attempts")
     return False
 
 
+async def relay_from_redis(session_id: str):
+    """Forward messages published by other workers to the local WebSocket"""
+    pubsub = redis_client.pubsub()
+    channel = f"ws:{session_id}"
+    await pubsub.subscribe(channel)
+
+    try:
+        async for msg in pubsub.listen():
+            if msg['type'] != 'message':
+                continue
+
+            connection_info = active_connections.get(session_id)
+            if connection_info is None:
+                break
+
+            try:
+                # Payload was orjson-encoded by the publishing worker
+                await connection_info['send_bytes'](msg['data'])
+            except Exception as e:
+                logger.warning(f"[WebSocket] ⚠️  Redis relay send failed for {session_id}: {e}")
+                break
+    finally:
+        await pubsub.unsubscribe(channel)
+        await pubsub.close()
+
+
 # ============================================================================
 # KEEP-ALIVE TASK
 # ============================================================================
@@ -138,12 +237,12 @@ async def keep_alive_task(session_id: str):
                     'type': 'ping',
                     'timestamp': datetime.now().isoformat()
                 })
-                print(f"[WebSocket] 🏓 Heartbeat sent to {session_id}")
+                logger.debug(f"[WebSocket] 🏓 Heartbeat sent to {session_id}")
         except asyncio.CancelledError:
-            print(f"[WebSocket] Keep-alive task cancelled for {session_id}")
+            logger.info(f"[WebSocket] Keep-alive task cancelled for {session_id}")
             break
         except Exception as e:
-            print(f"[WebSocket] ❌ Keep-alive error for {session_id}: {e}")
+            logger.error(f"[WebSocket] ❌ Keep-alive error for {session_id}: {e}")
             break
 
 
@@ -194,6 +293,8 @@ async def websocket_endpoint(websocket: WebSocket, api_key: Optional[str] = Quer
     session_id = None
     user_api_key = api_key
     keep_alive = None
+    relay_task = None
+    session_event = None
     
     try:
         # Get API key
@@ -249,7 +350,7 @@ async def websocket_endpoint(websocket: WebSocket, api_key: Optional[str] = Quer
             old_connection = active_connections[session_id]
             old_ws = old_connection['websocket']
             old_keep_alive = old_connection.get('keep_alive_task')
-            
+
             # Cancel old keep-alive task
             if old_keep_alive and not old_keep_alive.done():
                 old_keep_alive.cancel()
@@ -257,7 +358,7 @@ async def websocket_endpoint(websocket: WebSocket, api_key: Optional[str] = Quer
                     await old_keep_alive
                 except asyncio.CancelledError:
                     pass
-            
+
             # Close old WebSocket gracefully
             try:
                 await old_ws.close(code=1000, reason="Client reconnected")
@@ -269,11 +370,36 @@ async def websocket_endpoint(websocket: WebSocket, api_key: Optional[str] = Quer
         
         active_connections[session_id] = {
             'websocket': websocket,
+            'send_bytes': websocket.send_bytes,  # bound once at registration
             'keep_alive_task': keep_alive,
             'connected_at': datetime.now().isoformat(),
             'instance_id': instance_id
         }
-        
+
+        # This worker owns the session - relay messages published for it by
+        # other workers. Cancel any prior relay first: it can outlive its
+        # connection entry (e.g. after a failed send popped it), and two
+        # relays on one channel would deliver every publish twice
+        if redis_client is not None:
+            old_relay = session_relays.pop(session_id, None)
+            if old_relay and not old_relay.done():
+                old_relay.cancel()
+                try:
+                    await old_relay
+                except asyncio.CancelledError:
+                    pass
+
+            relay_task = asyncio.create_task(relay_from_redis(session_id))
+            session_relays[session_id] = relay_task
+
+        # Wake senders waiting on a reconnect, then arm a fresh event
+        # for the next disconnect/reconnect cycle
+        old_event = session_events.get(session_id)
+        session_event = asyncio.Event()
+        session_events[session_id] = session_event
+        if old_event is not None:
+            old_event.set()
+
         print(f"[WebSocket] ✅ Session {session_id} registered. Active: {len(active_connections)}")
         
         # Create orchestrator
@@ -436,6 +562,12 @@ Ready to deploy? Just say 'deploy' or 'yes'!"""
                             'code': 'API_ERROR',
                             'timestamp': datetime.now().isoformat()
                         })
+
+                finally:
+                    # Flush remaining progress updates and stop the
+                    # notifier's background sender
+                    if progress_notifier:
+                        await progress_notifier.close()
     
     except WebSocketDisconnect:
         print(f"[WebSocket] 🔌 Client {session_id} disconnected normally")
@@ -448,10 +580,10 @@ Ready to deploy? Just say 'deploy' or 'yes'!"""
         print(traceback.format_exc())
     
     finally:
-        # Cleanup
-        if session_id and session_id in active_connections:
-            connection_info = active_connections[session_id]
-            
+        # Cleanup runs unconditionally: safe_send_json may already have
+        # popped the connection entry after a failed send, so task teardown
+        # can't hinge on active_connections membership
+        if session_id:
             # Cancel keep-alive
             if keep_alive and not keep_alive.done():
                 keep_alive.cancel()
@@ -459,10 +591,31 @@ Ready to deploy? Just say 'deploy' or 'yes'!"""
                     await keep_alive
                 except asyncio.CancelledError:
                     pass
-            
-            # Remove from active connections
-            del active_connections[session_id]
-            print(f"[WebSocket] 🧹 Cleaned up {session_id}. Remaining: {len(active_connections)}")
+
+            # Cancel this handler's Redis relay; unregister it only if a
+            # reconnect hasn't already installed a replacement
+            if relay_task is not None:
+                if not relay_task.done():
+                    relay_task.cancel()
+                    try:
+                        await relay_task
+                    except asyncio.CancelledError:
+                        pass
+                if session_relays.get(session_id) is relay_task:
+                    del session_relays[session_id]
+
+            # Drop this handler's reconnect event unless a newer connection
+            # has re-armed the slot - stale armed events accumulate forever
+            # and keep broadcast_to_session retrying dead sessions
+            if session_event is not None and session_events.get(session_id) is session_event:
+                del session_events[session_id]
+
+            # Remove connection state only if this handler still owns it
+            # (a reconnect may have registered a newer socket under the id)
+            connection_info = active_connections.get(session_id)
+            if connection_info is not None and connection_info['websocket'] is websocket:
+                del active_connections[session_id]
+                print(f"[WebSocket] 🧹 Cleaned up {session_id}. Remaining: {len(active_connections)}")
 
 
 # ============================================================================
@@ -699,5 +852,12 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=port,
-        log_level="info"
+        log_level="info",
+        # uvloop (bundled with uvicorn[standard]) roughly doubles the
+        # sustained WebSocket send rate for the progress stream vs the
+        # default asyncio loop
+        loop="uvloop",
+        # RFC 7692 compression - progress payloads are highly repetitive
+        # JSON, typically 3-5x smaller on the wire with deflate
+        ws_per_message_deflate=True
     )
\ No newline at end of file
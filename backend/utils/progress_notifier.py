@@ -4,18 +4,66 @@ Uses safe WebSocket sending to avoid "close message sent" errors
 """
 
 import asyncio
+import logging
+import time
+from enum import IntEnum
 from typing import Callable, Optional
 from datetime import datetime
 
+# Child of the "servergem" logger configured in app.py - writes go through
+# a QueueHandler so the event loop never blocks on stdout
+logger = logging.getLogger("servergem.progress")
 
-class DeploymentStages:
-    """Stage name constants"""
-    REPO_CLONE = "repo_clone"
-    CODE_ANALYSIS = "code_analysis"
-    DOCKERFILE_GEN = "dockerfile_generation"
-    SECURITY_SCAN = "security_scan"
-    CONTAINER_BUILD = "container_build"
-    CLOUD_DEPLOYMENT = "cloud_deployment"
+# Coalescing window (seconds) for batching bursty updates into one frame
+FLUSH_WINDOW = 0.005
+
+# Cap on buffered updates per notifier - a slow client must not grow
+# the pending buffer without bound
+MAX_PENDING = 256
+
+# Constant for sub-tenth durations - skips float formatting and reads
+# better than "0.0s"
+_SUB_TENTH = "<0.1s"
+
+
+def _format_duration(duration: float) -> str:
+    """Human-readable stage duration"""
+    return f"{duration:.1f}s" if duration > 0.05 else _SUB_TENTH
+
+# Timestamp cache - full datetime formatting is expensive relative to a
+# WebSocket send, so reuse the per-second ISO prefix within each second
+_ts_cache_sec = 0
+_ts_cache_prefix = ""
+
+
+def _iso_timestamp() -> str:
+    """ISO timestamp with millisecond precision, cheap for bursty sends"""
+    global _ts_cache_sec, _ts_cache_prefix
+
+    now_ns = time.time_ns()
+    sec = now_ns // 1_000_000_000
+
+    if sec != _ts_cache_sec:
+        _ts_cache_sec = sec
+        _ts_cache_prefix = datetime.fromtimestamp(sec).isoformat()
+
+    ms = (now_ns // 1_000_000) % 1000
+    return f"{_ts_cache_prefix}.{ms:03d}"
+
+
+class DeploymentStages(IntEnum):
+    """Stage identifiers - sent as small ints on the wire
+
+    The frontend keeps the reverse map (DEPLOYMENT_STAGE_IDS in
+    src/types/websocket.ts); one byte per event instead of a 20+ byte
+    stage name string.
+    """
+    REPO_CLONE = 1
+    CODE_ANALYSIS = 2
+    DOCKERFILE_GEN = 3
+    SECURITY_SCAN = 4
+    CONTAINER_BUILD = 5
+    CLOUD_DEPLOYMENT = 6
 
 
 class ProgressNotifier:
@@ -23,7 +71,23 @@ class ProgressNotifier:
     Sends real-time progress updates to frontend via WebSocket
     بِسْمِ اللَّهِ - Bismillah
     """
-    
+
+    # One instance per deployment - slots keep per-instance memory down
+    # and make the hot-path attribute reads fixed-offset loads
+    __slots__ = (
+        "session_id",
+        "deployment_id",
+        "safe_send",
+        "current_stage",
+        "_stage_start_perf",
+        "_envelope",
+        "_batch_envelope",
+        "_pending",
+        "_wake",
+        "_worker_task",
+        "_seq",
+    )
+
     def __init__(self, session_id: str, deployment_id: str, safe_send_func: Callable):
         """
         Initialize progress notifier
@@ -37,8 +101,26 @@ class ProgressNotifier:
         self.deployment_id = deployment_id
         self.safe_send = safe_send_func
         self.current_stage = None
-        self.stage_start_time = None
-    
+        self._stage_start_perf: Optional[float] = None
+        # Static envelope built once - every payload shares these fields
+        self._envelope = {
+            "type": "deployment_progress",
+            "deployment_id": deployment_id
+        }
+        # Reusable batch frame - safe_send serializes synchronously before
+        # returning, so mutating this on the next flush can't corrupt an
+        # in-flight frame. Event payloads themselves are NOT reusable: they
+        # sit in _pending until the flush happens.
+        self._batch_envelope = {
+            "type": "deployment_progress_batch",
+            "deployment_id": deployment_id,
+            "events": None
+        }
+        self._pending: list = []
+        self._wake = asyncio.Event()
+        self._worker_task: Optional[asyncio.Task] = None
+        self._seq = 0
+
     async def send_update(
         self,
         stage: str,
@@ -47,55 +129,222 @@ class ProgressNotifier:
         details: Optional[dict] = None,
         progress: Optional[int] = None
     ):
-        """Send progress update to frontend"""
-        
-        payload = {
-            "type": "deployment_progress",
-            "deployment_id": self.deployment_id,
-            "stage": stage,
+        """Queue progress update for delivery to frontend"""
+
+        payload = self._base_payload(stage, status, message)
+
+        if details:
+            payload["details"] = details
+
+        if progress is not None:
+            payload["progress"] = progress
+
+        self._enqueue(payload)
+
+    def _base_payload(self, stage, status: str, message: str) -> dict:
+        """Payload skeleton shared by every update.
+
+        Key order is deliberately identical across payloads: with
+        permessage-deflate enabled the repeated key bytes sit at the same
+        offsets, maximizing LZ77 back-references in the shared window.
+        """
+        self._seq += 1
+        return {
+            **self._envelope,
+            "seq": self._seq,  # frontend detects dropped updates via gaps
+            "stage": int(stage) if isinstance(stage, DeploymentStages) else stage,
             "status": status,  # 'waiting', 'in-progress', 'success', 'error'
             "message": message,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _iso_timestamp()
         }
-        
+
+    def _enqueue(self, payload: dict):
+        """Buffer a payload and wake the background sender.
+
+        Coalesces bursty updates into one frame shortly after, amortizing
+        WebSocket/TLS/TCP framing overhead across N messages - the
+        deployment pipeline never awaits the network for a routine tick.
+        """
+        if len(self._pending) >= MAX_PENDING:
+            self._drop_oldest_tick()
+        self._pending.append(payload)
+
+        self._wake.set()
+        if self._worker_task is None:
+            self._worker_task = asyncio.create_task(self._worker())
+
+    # Status-specialized senders: the stage lifecycle methods always emit
+    # a fixed payload shape, so skip send_update's optional-field branches
+
+    def _send_in_progress(self, stage, message: str):
+        """In-progress event without optional fields (stage start)"""
+        self._enqueue(self._base_payload(stage, "in-progress", message))
+
+    def _send_progress_tick(self, stage, message: str, progress: int):
+        """In-progress event carrying a percentage"""
+        payload = self._base_payload(stage, "in-progress", message)
+        payload["progress"] = progress
+        self._enqueue(payload)
+
+    def _send_success(self, stage, message: str, details: Optional[dict] = None):
+        """Terminal success event"""
+        payload = self._base_payload(stage, "success", message)
         if details:
             payload["details"] = details
-        
-        if progress is not None:
-            payload["progress"] = progress
-        
-        # Use safe send function
+        self._enqueue(payload)
+
+    def _send_error(self, stage, message: str, details: Optional[dict] = None):
+        """Terminal error event"""
+        payload = self._base_payload(stage, "error", message)
+        if details:
+            payload["details"] = details
+        self._enqueue(payload)
+
+    def _drop_oldest_tick(self):
+        """Drop the oldest buffered 'in-progress' tick to stay bounded.
+
+        Terminal states (success/error) are preserved - losing an
+        intermediate percentage tick is harmless, losing a final state
+        is not.
+        """
+        for i, event in enumerate(self._pending):
+            if event["status"] == "in-progress":
+                dropped = self._pending.pop(i)
+                logger.warning(
+                    f"[Progress] ⚠️  Buffer full, dropped tick seq={dropped['seq']} ({dropped['stage']})"
+                )
+                return
+        # Only terminal states buffered (unusual) - keep them all
+
+    async def _worker(self):
+        """Long-lived background sender for this notifier.
+
+        Waits until updates are queued, lets the coalescing window pass so
+        a burst can accumulate, then flushes - one task for the lifetime
+        of the notifier instead of a task per burst.
+        """
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await asyncio.sleep(FLUSH_WINDOW)
+            await self._flush_now()
+
+    async def _flush_now(self):
+        """Send all buffered updates immediately (single frame if batched)"""
+        if not self._pending:
+            return
+
+        events = self._pending
+        self._pending = []
+
+        if len(events) == 1:
+            # Single update - keep the plain frame format
+            payload = events[0]
+        else:
+            # One envelope dict per notifier instead of one per flush
+            payload = self._batch_envelope
+            payload["events"] = events
+
         success = await self.safe_send(self.session_id, payload)
-        
+        self._batch_envelope["events"] = None  # don't pin the sent list
+
         if success:
-            print(f"[Progress] ✅ Sent: {stage} - {status}")
+            logger.debug(f"[Progress] ✅ Flushed {len(events)} update(s)")
         else:
-            print(f"[Progress] ⚠️  Failed to send: {stage} - {status}")
-    
+            logger.warning(f"[Progress] ⚠️  Failed to flush {len(events)} update(s)")
+
+    async def close(self):
+        """Flush remaining updates and stop the background sender"""
+        await self._flush_now()
+
+        if self._worker_task is not None:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+
     async def start_stage(self, stage: str, message: str):
         """Mark stage as started"""
         self.current_stage = stage
-        self.stage_start_time = datetime.now()
-        await self.send_update(stage, "in-progress", message)
-    
+        # Monotonic clock: immune to wall-clock jumps (NTP syncs)
+        self._stage_start_perf = time.perf_counter()
+        self._send_in_progress(stage, message)
+
     async def complete_stage(self, stage: str, message: str, details: Optional[dict] = None):
         """Mark stage as completed"""
         duration = None
-        if self.stage_start_time:
-            duration = (datetime.now() - self.stage_start_time).total_seconds()
-        
-        if details is None:
-            details = {}
-        
+        if self._stage_start_perf is not None:
+            duration = time.perf_counter() - self._stage_start_perf
+
+        # Only allocate a details dict when there's something to put in it
         if duration:
-            details["duration"] = f"{duration:.1f}s"
-        
-        await self.send_update(stage, "success", message, details=details)
-    
+            if details is None:
+                details = {}
+            details["duration"] = _format_duration(duration)
+
+        self._send_success(stage, message, details)
+        # Terminal state - flush immediately so users see it without delay
+        await self._flush_now()
+
+    async def transition_stage(
+        self,
+        old_stage: str,
+        new_stage: str,
+        complete_msg: str,
+        start_msg: str,
+        details: Optional[dict] = None
+    ):
+        """Complete one stage and start the next in a single frame
+
+        Back-to-back complete_stage/start_stage is the most common event
+        pair, so fusing them halves per-frame overhead for transitions.
+        """
+        duration = None
+        if self._stage_start_perf is not None:
+            duration = time.perf_counter() - self._stage_start_perf
+
+        # Only allocate a details dict when there's something to put in it
+        if duration:
+            if details is None:
+                details = {}
+            details["duration"] = _format_duration(duration)
+
+        self._send_success(old_stage, complete_msg, details)
+
+        self.current_stage = new_stage
+        # Monotonic clock: immune to wall-clock jumps (NTP syncs)
+        self._stage_start_perf = time.perf_counter()
+        self._send_in_progress(new_stage, start_msg)
+
+        # Both events ride one frame, and the completed stage is terminal
+        await self._flush_now()
+
     async def fail_stage(self, stage: str, error_message: str, details: Optional[dict] = None):
         """Mark stage as failed"""
-        await self.send_update(stage, "error", error_message, details=details)
-    
+        self._send_error(stage, error_message, details)
+        # Terminal state - flush immediately so users see it without delay
+        await self._flush_now()
+
     async def update_progress(self, stage: str, message: str, progress: int):
         """Update progress percentage for current stage"""
-        await self.send_update(stage, "in-progress", message, progress=progress)
\ No newline at end of file
+        self._send_progress_tick(stage, message, progress)
+
+    @staticmethod
+    async def broadcast(
+        notifiers: "list[ProgressNotifier]",
+        stage: str,
+        status: str,
+        message: str
+    ):
+        """Send the same update through many notifiers concurrently
+
+        Fans out with asyncio.gather so a server-wide event takes one
+        scheduling pass instead of N sequential awaits; one failing
+        session doesn't block the rest.
+        """
+        await asyncio.gather(
+            *[n.send_update(stage, status, message) for n in notifiers],
+            return_exceptions=True
+        )
\ No newline at end of file
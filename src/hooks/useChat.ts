@@ -4,10 +4,10 @@
  * Now uses app-level WebSocket context for persistent connection
  */
 
-import { useState, useCallback, useEffect } from 'react';
+import { useState, useCallback, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useWebSocketContext } from '@/contexts/WebSocketContext';
-import { UseChatReturn, ChatMessage, ServerMessage } from '@/types/websocket';
+import { UseChatReturn, ChatMessage, ServerMessage, DEPLOYMENT_STAGE_IDS } from '@/types/websocket';
 import { useToast } from '@/hooks/use-toast';
 import { toast as sonnerToast } from 'sonner';
 
@@ -27,6 +27,7 @@ export const useChat = (): UseChatReturn => {
   const { toast } = useToast();
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [isTyping, setIsTyping] = useState(false);
+  const lastProgressSeq = useRef(-1);
   
   // Debug: Log state changes
   useEffect(() => {
@@ -121,6 +122,7 @@ export const useChat = (): UseChatReturn => {
         setIsTyping(true);
         
         const deploymentMsg = serverMessage as any;
+        lastProgressSeq.current = -1;  // New deployment, new sequence
         const deployStartContent = `## 🚀 Deployment Started\n\n${deploymentMsg.data?.message || 'Starting deployment process to Cloud Run...'}\n\n**Deployment ID:** \`${deploymentMsg.deployment_id}\`\n\n---\n\n*Real-time updates will appear below as each stage completes...*`;
         
         addAssistantMessage({
@@ -135,6 +137,15 @@ export const useChat = (): UseChatReturn => {
         
         // Add beautifully formatted progress update
         const progressMsg = serverMessage as any;
+
+        // Detect dropped updates via sequence gaps
+        if (typeof progressMsg.seq === 'number') {
+          if (lastProgressSeq.current >= 0 && progressMsg.seq > lastProgressSeq.current + 1) {
+            console.warn(`[useChat] ⚠️ Progress gap: missed seq ${lastProgressSeq.current + 1}-${progressMsg.seq - 1}`);
+          }
+          lastProgressSeq.current = progressMsg.seq;
+        }
+
         const stageIcons: Record<string, string> = {
           repo_clone: '📦',
           code_analysis: '🔍',
@@ -153,8 +164,13 @@ export const useChat = (): UseChatReturn => {
           cloud_deployment: 'Cloud Deployment',
         };
         
-        const icon = stageIcons[progressMsg.stage] || '⚙️';
-        const stageName = stageNames[progressMsg.stage] || progressMsg.stage;
+        // Numeric wire id from the backend enum, or a legacy string id
+        const stageId = typeof progressMsg.stage === 'number'
+          ? (DEPLOYMENT_STAGE_IDS[progressMsg.stage] || `stage_${progressMsg.stage}`)
+          : progressMsg.stage;
+
+        const icon = stageIcons[stageId] || '⚙️';
+        const stageName = stageNames[stageId] || stageId;
         
         let statusIcon = '';
         let statusText = '';
@@ -190,10 +206,20 @@ export const useChat = (): UseChatReturn => {
         
         addAssistantMessage({
           content,
-          metadata: { type: 'deployment_progress', stage: progressMsg.stage }
+          metadata: { type: 'deployment_progress', stage: stageId }
         });
         break;
-        
+
+      case 'deployment_progress_batch':
+        // Coalesced frame from the backend - unpack and handle each event
+        const batchMsg = serverMessage as any;
+        console.log('[useChat] 📊 Deployment progress batch:', batchMsg.events?.length);
+
+        (batchMsg.events || []).forEach((event: ServerMessage) => {
+          handleServerMessage(event);
+        });
+        break;
+
       case 'message':
         console.log('[useChat] Setting typing to false, adding message');
         setIsTyping(false);
@@ -103,6 +103,8 @@ export class WebSocketClient {
       
       console.log('[WebSocket] Connecting with API key:', apiKey ? 'Yes' : 'No');
       this.ws = new WebSocket(url);
+      // Backend sends orjson-encoded binary frames - avoid Blob indirection
+      this.ws.binaryType = 'arraybuffer';
       this.setupEventHandlers();
       
       // Connection timeout
@@ -254,7 +256,11 @@ export class WebSocketClient {
   
   private handleMessage(event: MessageEvent): void {
     try {
-      const message: ServerMessage = JSON.parse(event.data);
+      // Frames may arrive as text or as orjson-encoded binary
+      const raw = typeof event.data === 'string'
+        ? event.data
+        : new TextDecoder().decode(event.data);
+      const message: ServerMessage = JSON.parse(raw);
       console.log('[WebSocket] Received message:', message.type);
       
       // Handle pong for heartbeat
@@ -35,6 +35,7 @@ export type ServerMessageType =
   | 'analysis'            // Code analysis result
   | 'deployment_started'  // Deployment process started
   | 'deployment_progress' // Real-time deployment progress
+  | 'deployment_progress_batch' // Batched deployment progress events
   | 'deployment_update'   // Deployment progress update (legacy)
   | 'deployment_complete' // Deployment finished
   | 'error'               // Error occurred
@@ -143,7 +144,8 @@ export interface ServerDeploymentStarted {
 export interface ServerDeploymentProgress {
   type: 'deployment_progress';
   deployment_id: string;
-  stage: string;
+  seq?: number;  // Monotonic per-deployment counter - gaps mean dropped updates
+  stage: string | number;  // Numeric wire id (see DEPLOYMENT_STAGE_IDS) or legacy string
   status: string;
   message: string;
   details?: Record<string, any>;
@@ -151,6 +153,25 @@ export interface ServerDeploymentProgress {
   timestamp: string;
 }
 
+/**
+ * Deployment stages arrive as small integers on the wire (backend
+ * DeploymentStages IntEnum) - reverse map to the string ids used in the UI
+ */
+export const DEPLOYMENT_STAGE_IDS: Record<number, string> = {
+  1: 'repo_clone',
+  2: 'code_analysis',
+  3: 'dockerfile_generation',
+  4: 'security_scan',
+  5: 'container_build',
+  6: 'cloud_deployment',
+};
+
+export interface ServerDeploymentProgressBatch {
+  type: 'deployment_progress_batch';
+  deployment_id: string;
+  events: ServerDeploymentProgress[];
+}
+
 export interface ServerDeploymentComplete {
   type: 'deployment_complete';
   data: {
@@ -185,6 +206,7 @@ export type ServerMessage =
   | ServerAnalysisMessage
   | ServerDeploymentStarted
   | ServerDeploymentProgress
+  | ServerDeploymentProgressBatch
   | ServerDeploymentUpdate
   | ServerDeploymentComplete
   | ServerErrorMessage